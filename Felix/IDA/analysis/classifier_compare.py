@@ -14,9 +14,12 @@ Both approaches use the same scoring mechanisms:
 import re
 import json
 import math
+import struct
 import hashlib
 from difflib import SequenceMatcher
-from typing import List, Dict, Any
+from functools import lru_cache
+from operator import itemgetter
+from typing import List, Dict, Any, Optional, Sequence, Tuple
 
 
 # --------------------------------------------------------------
@@ -85,6 +88,54 @@ intents[3]{id,label,keywords,description,starter_phrases,semantic_vector,trigger
 # 4. PARSE TOON → PYTHON
 # --------------------------------------------------------------
 
+# Characters that can change the row splitter's state; everything else is
+# plain field text, so the scan jumps straight from one of these to the next
+_TOON_SPECIAL_RE = re.compile(r'[",\[\]]')
+# Trigger separators: commas not escaped with a backslash
+_TRIGGER_SPLIT_RE = re.compile(r'(?<!\\),')
+
+
+def _split_toon_row(line: str) -> List[str]:
+    """
+    Split a TOON row into stripped fields on commas outside quotes/brackets.
+    
+    An escaped quote (\\") doesn't open or close a quoted run. Empty fields
+    are kept; a trailing comma doesn't add an empty field.
+    """
+    parts = []
+    start = 0
+    in_quotes = False
+    in_brackets = False
+    
+    for match in _TOON_SPECIAL_RE.finditer(line):
+        i = match.start()
+        char = line[i]
+        if char == '"':
+            if i == 0 or line[i-1] != '\\':
+                in_quotes = not in_quotes
+        elif in_quotes:
+            continue
+        elif char == '[':
+            in_brackets = True
+        elif char == ']':
+            in_brackets = False
+        elif not in_brackets:
+            parts.append(line[start:i].strip())
+            start = i + 1
+    
+    if start < len(line):
+        parts.append(line[start:].strip())
+    return parts
+
+
+def _split_triggers(triggers_str: str) -> List[str]:
+    """Split a trigger list on unescaped commas (a trailing comma adds nothing)."""
+    triggers = _TRIGGER_SPLIT_RE.split(triggers_str)
+    if not triggers[-1]:
+        triggers.pop()
+    return [t.strip() for t in triggers]
+
+
 def parse_toon_intents(toon_str: str) -> List[Dict[str, Any]]:
     """
     Parse the TOON intent specification into a list of intent dicts.
@@ -112,38 +163,8 @@ def parse_toon_intents(toon_str: str) -> List[Dict[str, Any]]:
     data_lines = [line.strip() for line in lines if line.strip() and not line.strip().startswith('intents')]
     
     for line in data_lines:
-        if not line:
-            continue
-        
-        # More robust parsing: handle quoted strings and brackets
-        parts = []
-        current = ""
-        in_quotes = False
-        in_brackets = False
-        
-        i = 0
-        while i < len(line):
-            char = line[i]
-            
-            if char == '"' and (i == 0 or line[i-1] != '\\'):
-                in_quotes = not in_quotes
-                current += char
-            elif char == '[' and not in_quotes:
-                in_brackets = True
-                current += char
-            elif char == ']' and not in_quotes:
-                in_brackets = False
-                current += char
-            elif char == ',' and not in_quotes and not in_brackets:
-                parts.append(current.strip())
-                current = ""
-            else:
-                current += char
-            
-            i += 1
-        
-        if current:
-            parts.append(current.strip())
+        # Split by comma respecting quotes and brackets
+        parts = _split_toon_row(line)
         
         if len(parts) < 7:
             continue
@@ -153,36 +174,20 @@ def parse_toon_intents(toon_str: str) -> List[Dict[str, Any]]:
         label = parts[1].strip()
         
         # Parse keywords (remove quotes, split by comma)
-        keywords_str = parts[2].strip().strip('"')
-        keywords = [k.strip() for k in keywords_str.split(',')]
+        keywords = [k.strip() for k in parts[2].strip('"').split(',')]
         
         # Description (remove quotes)
-        description = parts[3].strip().strip('"')
+        description = parts[3].strip('"')
         
         # Parse starter_phrases (remove quotes, split by comma)
-        starters_str = parts[4].strip().strip('"')
-        starter_phrases = [s.strip() for s in starters_str.split(',')]
+        starter_phrases = [s.strip() for s in parts[4].strip('"').split(',')]
         
         # Parse semantic_vector (remove brackets, split by comma)
-        vector_str = parts[5].strip().strip('[]')
-        semantic_vector = [float(x.strip()) for x in vector_str.split(',')]
+        semantic_vector = [float(x.strip()) for x in parts[5].strip('[]').split(',')]
         
-        # Parse triggers (remove quotes, split by comma, preserve escaped sequences)
-        triggers_str = parts[6].strip().strip('"')
-        # Split by comma but preserve escaped sequences
-        triggers = []
-        current_trigger = ""
-        i = 0
-        while i < len(triggers_str):
-            char = triggers_str[i]
-            if char == ',' and (i == 0 or triggers_str[i-1] != '\\'):
-                triggers.append(current_trigger.strip())
-                current_trigger = ""
-            else:
-                current_trigger += char
-            i += 1
-        if current_trigger:
-            triggers.append(current_trigger.strip())
+        # Parse triggers (remove quotes, split on unescaped commas so regex
+        # text such as character classes and \, is preserved)
+        triggers = _split_triggers(parts[6].strip('"'))
         
         # Convert escaped sequences to raw strings for regex
         # In TOON, \\b becomes \b in Python string, which is correct for regex
@@ -202,43 +207,108 @@ def parse_toon_intents(toon_str: str) -> List[Dict[str, Any]]:
     return parsed_intents
 
 
+# Stand-in for invalid trigger regexes: keeps the denominator, never matches
+_NEVER_MATCH = re.compile(r"(?!)")
+
+
+def compile_triggers(triggers: List[str]) -> List[re.Pattern]:
+    """
+    Compile regex triggers once, case-insensitively.
+    
+    Invalid patterns are replaced by a pattern that never matches, so they
+    still count towards len(triggers) exactly as before.
+    
+    Args:
+        triggers: List of regex pattern strings.
+        
+    Returns:
+        List of compiled patterns, one per trigger.
+    """
+    compiled = []
+    for pattern in triggers:
+        try:
+            compiled.append(re.compile(pattern, re.IGNORECASE))
+        except re.error:
+            compiled.append(_NEVER_MATCH)
+    return compiled
+
+
+def prepare_intent(intent: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Attach load-time derived data to an intent dict (in place).
+    
+    Adds:
+      _triggers_re → compiled "triggers" (see compile_triggers)
+      _keywords_lc → lowercased "keywords"
+      _starters_lc → lowercased "starter_phrases"
+      _semantic_mag → length of a 3D "semantic_vector" (None otherwise)
+    
+    Args:
+        intent: Intent dictionary with the INTENTS_JSON structure.
+        
+    Returns:
+        The same intent dictionary, for convenience.
+    """
+    intent["_triggers_re"] = compile_triggers(intent.get("triggers", []))
+    intent["_keywords_lc"] = [k.lower() for k in intent.get("keywords", [])]
+    intent["_starters_lc"] = [s.lower() for s in intent.get("starter_phrases", [])]
+    
+    vector = intent.get("semantic_vector", [])
+    intent["_semantic_mag"] = (
+        math.sqrt(sum(x*x for x in vector)) if len(vector) == 3 else None
+    )
+    return intent
+
+
+# Prepared copies of the JSON spec; INTENTS_JSON itself stays plain data
+_PREPARED_JSON: List[Dict[str, Any]] = [prepare_intent(dict(i)) for i in INTENTS_JSON]
+
+
 # --------------------------------------------------------------
 # 5. FAKE EMBEDDING FOR USER MESSAGE
 # --------------------------------------------------------------
 
-def fake_embedding(text: str) -> List[float]:
+_EMBEDDING_STRUCT = struct.Struct(">III")
+_UINT32_RANGE = float(16**8)
+
+
+@lru_cache(maxsize=1024)
+def fake_embedding(text: str) -> Tuple[float, float, float]:
     """
     Convert text into a deterministic 3D vector.
     
-    Uses hashlib.sha256(text.encode()).hexdigest() to generate 3 small floats.
-    Normalizes the vector to unit length.
+    Uses the first 12 bytes of hashlib.sha256(text.encode()).digest() as
+    three big-endian 32-bit integers to generate 3 small floats.
+    Normalizes the vector to unit length. Results are memoized, so the
+    vector is returned as an immutable tuple.
     
     Args:
         text: Input text to embed.
         
     Returns:
-        A normalized 3D vector [x, y, z] with unit length.
+        A normalized 3D vector (x, y, z) with unit length.
     """
-    hash_obj = hashlib.sha256(text.encode())
-    hex_str = hash_obj.hexdigest()
+    digest = hashlib.sha256(text.encode()).digest()
     
-    # Extract 3 floats from hex string (each 8 hex chars = 4 bytes)
-    x = int(hex_str[0:8], 16) / (16**8)
-    y = int(hex_str[8:16], 16) / (16**8)
-    z = int(hex_str[16:24], 16) / (16**8)
+    # Unpack 3 floats straight from the raw digest (4 bytes each), no hex
+    # string round-trip
+    a, b, c = _EMBEDDING_STRUCT.unpack_from(digest)
+    x = a / _UINT32_RANGE
+    y = b / _UINT32_RANGE
+    z = c / _UINT32_RANGE
     
     # Normalize to unit length
     magnitude = math.sqrt(x*x + y*y + z*z)
     if magnitude > 0:
-        return [x/magnitude, y/magnitude, z/magnitude]
-    return [0.0, 0.0, 1.0]
+        return (x/magnitude, y/magnitude, z/magnitude)
+    return (0.0, 0.0, 1.0)
 
 
 # --------------------------------------------------------------
 # 6. SCORING FUNCTIONS
 # --------------------------------------------------------------
 
-def pattern_score(message: str, triggers: List[str]) -> float:
+def pattern_score(message: str, triggers: List[re.Pattern]) -> float:
     """
     Count how many regex triggers match the message.
     
@@ -246,7 +316,7 @@ def pattern_score(message: str, triggers: List[str]) -> float:
     
     Args:
         message: User message to score.
-        triggers: List of regex pattern strings.
+        triggers: List of compiled patterns (see compile_triggers).
         
     Returns:
         Score between 0.0 and 1.0.
@@ -256,17 +326,14 @@ def pattern_score(message: str, triggers: List[str]) -> float:
     
     matches = 0
     for pattern in triggers:
-        try:
-            if re.search(pattern, message, re.IGNORECASE):
-                matches += 1
-        except re.error:
-            # Invalid regex, skip
-            continue
+        if pattern.search(message):
+            matches += 1
     
     return matches / len(triggers)
 
 
-def keyword_score(message: str, keywords: List[str]) -> float:
+def keyword_score(message: str, keywords: List[str],
+                  message_lower: Optional[str] = None) -> float:
     """
     Count keywords found in message.
     
@@ -275,6 +342,7 @@ def keyword_score(message: str, keywords: List[str]) -> float:
     Args:
         message: User message to score.
         keywords: List of keyword strings to search for.
+        message_lower: message.lower(), if the caller already computed it.
         
     Returns:
         Score between 0.0 and 1.0.
@@ -282,13 +350,29 @@ def keyword_score(message: str, keywords: List[str]) -> float:
     if not keywords:
         return 0.0
     
-    message_lower = message.lower()
-    found = sum(1 for keyword in keywords if keyword.lower() in message_lower)
+    if message_lower is None:
+        message_lower = message.lower()
     
-    return found / len(keywords)
+    return _keyword_fraction(message_lower, [k.lower() for k in keywords])
 
 
-def semantic_score(user_vec: List[float], intent_vec: List[float]) -> float:
+def _keyword_fraction(message_lower: str, keywords_lower: List[str]) -> float:
+    """
+    Fraction of (already lowercased) keywords contained in the message.
+    
+    Each check is a plain substring `in`, which runs entirely in C.
+    """
+    if not keywords_lower:
+        return 0.0
+    
+    found = 0
+    for keyword in keywords_lower:
+        found += keyword in message_lower
+    
+    return found / len(keywords_lower)
+
+
+def semantic_score(user_vec: Sequence[float], intent_vec: Sequence[float]) -> float:
     """
     Compute cosine similarity between two vectors.
     
@@ -313,7 +397,35 @@ def semantic_score(user_vec: List[float], intent_vec: List[float]) -> float:
     return dot_product / (magnitude_user * magnitude_intent)
 
 
-def starter_phrase_score(message: str, starters: List[str]) -> float:
+def semantic_score_3d(user_vec: Sequence[float], intent_vec: Sequence[float],
+                      magnitude_intent: float) -> float:
+    """
+    Cosine similarity specialized for 3-dimensional vectors.
+    
+    Same result as semantic_score, but unrolled (no zip/generator objects)
+    and with the intent magnitude precomputed at load time.
+    
+    Args:
+        user_vec: User message embedding vector (3 components).
+        intent_vec: Intent semantic vector (3 components).
+        magnitude_intent: Precomputed length of intent_vec.
+        
+    Returns:
+        Cosine similarity score between -1.0 and 1.0 (typically 0.0 to 1.0).
+    """
+    ua, ub, uc = user_vec
+    va, vb, vc = intent_vec
+    
+    magnitude_user = math.sqrt(ua*ua + ub*ub + uc*uc)
+    
+    if magnitude_user == 0 or magnitude_intent == 0:
+        return 0.0
+    
+    return (ua*va + ub*vb + uc*vc) / (magnitude_user * magnitude_intent)
+
+
+def starter_phrase_score(message: str, starters: List[str],
+                         message_lower: Optional[str] = None) -> float:
     """
     Use difflib.SequenceMatcher to compute similarity.
     
@@ -323,6 +435,7 @@ def starter_phrase_score(message: str, starters: List[str]) -> float:
     Args:
         message: User message to score.
         starters: List of starter phrase strings.
+        message_lower: message.lower(), if the caller already computed it.
         
     Returns:
         Maximum similarity score between 0.0 and 1.0.
@@ -330,12 +443,29 @@ def starter_phrase_score(message: str, starters: List[str]) -> float:
     if not starters:
         return 0.0
     
-    message_lower = message.lower()
+    if message_lower is None:
+        message_lower = message.lower()
+    
+    return _max_starter_similarity(message_lower, [s.lower() for s in starters])
+
+
+def _max_starter_similarity(message_lower: str, starters_lower: List[str]) -> float:
+    """
+    Maximum SequenceMatcher ratio between the message and the starters.
+    
+    Both sides must already be lowercased. real_quick_ratio() and
+    quick_ratio() are cheap upper bounds on ratio(), so a starter is only
+    fully matched when it could still beat the best similarity so far.
+    """
     max_similarity = 0.0
     
-    for starter in starters:
-        similarity = SequenceMatcher(None, message_lower, starter.lower()).ratio()
-        max_similarity = max(max_similarity, similarity)
+    for starter in starters_lower:
+        matcher = SequenceMatcher(None, message_lower, starter)
+        if matcher.real_quick_ratio() <= max_similarity:
+            continue
+        if matcher.quick_ratio() <= max_similarity:
+            continue
+        max_similarity = max(max_similarity, matcher.ratio())
     
     return max_similarity
 
@@ -344,7 +474,9 @@ def starter_phrase_score(message: str, starters: List[str]) -> float:
 # 7. COMBINED SCORE
 # --------------------------------------------------------------
 
-def combined_score(message: str, intent: Dict[str, Any]) -> Dict[str, float]:
+def combined_score(message: str, intent: Dict[str, Any],
+                   message_lower: Optional[str] = None,
+                   user_vec: Optional[Sequence[float]] = None) -> Dict[str, float]:
     """
     Compute pattern, keyword, semantic, and starter phrase scores.
     
@@ -357,6 +489,8 @@ def combined_score(message: str, intent: Dict[str, Any]) -> Dict[str, float]:
     Args:
         message: User message to classify.
         intent: Intent dictionary with all required fields.
+        message_lower: message.lower(), if the caller already computed it.
+        user_vec: fake_embedding(message), if the caller already computed it.
         
     Returns:
         Dictionary with all score components plus final weighted score:
@@ -368,12 +502,31 @@ def combined_score(message: str, intent: Dict[str, Any]) -> Dict[str, float]:
             "final": float
         }
     """
-    user_vec = fake_embedding(message)
-    
-    pattern = pattern_score(message, intent.get("triggers", []))
-    keyword = keyword_score(message, intent.get("keywords", []))
-    semantic = semantic_score(user_vec, intent.get("semantic_vector", []))
-    starter = starter_phrase_score(message, intent.get("starter_phrases", []))
+    if message_lower is None:
+        message_lower = message.lower()
+    
+    if user_vec is None:
+        user_vec = fake_embedding(message)
+    
+    triggers = intent.get("_triggers_re")
+    if triggers is None:
+        triggers = compile_triggers(intent.get("triggers", []))
+    
+    pattern = pattern_score(message, triggers)
+    keywords_lower = intent.get("_keywords_lc")
+    if keywords_lower is None:
+        keywords_lower = [k.lower() for k in intent.get("keywords", [])]
+    keyword = _keyword_fraction(message_lower, keywords_lower)
+    intent_vec = intent.get("semantic_vector", [])
+    magnitude_intent = intent.get("_semantic_mag")
+    if magnitude_intent is not None and len(user_vec) == 3:
+        semantic = semantic_score_3d(user_vec, intent_vec, magnitude_intent)
+    else:
+        semantic = semantic_score(user_vec, intent_vec)
+    starters_lower = intent.get("_starters_lc")
+    if starters_lower is None:
+        starters_lower = [s.lower() for s in intent.get("starter_phrases", [])]
+    starter = _max_starter_similarity(message_lower, starters_lower)
     
     # Ensure semantic score is non-negative for weighted average
     semantic_positive = max(0.0, semantic)
@@ -394,10 +547,36 @@ def combined_score(message: str, intent: Dict[str, Any]) -> Dict[str, float]:
     }
 
 
+def score_all_intents(message: str, intents: List[Dict[str, Any]]) -> List[Dict[str, float]]:
+    """
+    Run combined_score for every intent, sharing the per-message work.
+    
+    The message is lowercased and embedded once and reused by every
+    scorer instead of once per scorer per intent.
+    
+    Args:
+        message: User message to classify.
+        intents: Intent dictionaries to score against.
+        
+    Returns:
+        One combined_score dictionary per intent, in the same order.
+    """
+    message_lower = message.lower()
+    user_vec = fake_embedding(message)
+    return [
+        combined_score(message, intent, message_lower, user_vec)
+        for intent in intents
+    ]
+
+
 # --------------------------------------------------------------
 # 8. CLASSIFIERS
 # --------------------------------------------------------------
 
+# Sort key for candidate dicts (C-level, no per-element lambda call)
+_by_score = itemgetter("score")
+
+
 def classify_json(message: str) -> List[Dict[str, Any]]:
     """
     Classify message using JSON intent definitions.
@@ -417,8 +596,7 @@ def classify_json(message: str) -> List[Dict[str, Any]]:
     """
     candidates = []
     
-    for intent in INTENTS_JSON:
-        scores = combined_score(message, intent)
+    for intent, scores in zip(_PREPARED_JSON, score_all_intents(message, _PREPARED_JSON)):
         candidate = {
             "id": intent["id"],
             "label": intent["label"],
@@ -431,30 +609,31 @@ def classify_json(message: str) -> List[Dict[str, Any]]:
         candidates.append(candidate)
     
     # Sort by final score descending
-    candidates.sort(key=lambda x: x["score"], reverse=True)
+    candidates.sort(key=_by_score, reverse=True)
     
     return candidates
 
 
-def classify_toon(message: str, toon_intents: List[Dict[str, Any]]) -> tuple[str, List[float]]:
+def classify_toon(message: str, toon_intents: List[Dict[str, Any]]) -> tuple[str, List[Dict[str, Any]]]:
     """
     Classify message using TOON intent definitions.
     
-    Returns a TOON table string with ranking and sorted scores list.
+    Returns a TOON table string with ranking and the sorted candidates.
     
     Args:
         message: User message to classify.
         toon_intents: List of parsed TOON intent dictionaries.
         
     Returns:
-        Tuple of (TOON report string, sorted scores list).
+        Tuple of (TOON report string, candidate dictionaries with the same
+        fields as classify_json, sorted by final score descending).
     """
     candidates = []
     
-    for intent in toon_intents:
-        scores = combined_score(message, intent)
+    for intent, scores in zip(toon_intents, score_all_intents(message, toon_intents)):
         candidates.append({
             "id": intent["id"],
+            "label": intent["label"],
             "score": scores["final"],
             "pattern": scores["pattern"],
             "keyword": scores["keyword"],
@@ -463,7 +642,7 @@ def classify_toon(message: str, toon_intents: List[Dict[str, Any]]) -> tuple[str
         })
     
     # Sort by final score descending
-    candidates.sort(key=lambda x: x["score"], reverse=True)
+    candidates.sort(key=_by_score, reverse=True)
     
     # Build TOON report
     report_lines = [
@@ -478,15 +657,21 @@ def classify_toon(message: str, toon_intents: List[Dict[str, Any]]) -> tuple[str
         )
     
     report_str = "\n".join(report_lines)
-    scores_list = [c["score"] for c in candidates]
     
-    return report_str, scores_list
+    return report_str, candidates
 
 
 # --------------------------------------------------------------
 # 9. COMPARATOR
 # --------------------------------------------------------------
 
+# The specs are constants: parse / measure them once at import
+TOON_INTENTS: List[Dict[str, Any]] = parse_toon_intents(INTENTS_TOON)
+_PREPARED_TOON: List[Dict[str, Any]] = [prepare_intent(dict(i)) for i in TOON_INTENTS]
+JSON_SPEC_LENGTH: int = len(json.dumps(INTENTS_JSON, indent=2))
+TOON_SPEC_LENGTH: int = len(INTENTS_TOON)
+
+
 def compare_json_vs_toon(message: str) -> Dict[str, Any]:
     """
     Compare JSON vs TOON classification approaches.
@@ -515,28 +700,16 @@ def compare_json_vs_toon(message: str) -> Dict[str, Any]:
     top_json = json_candidates[0] if json_candidates else None
     
     # TOON classification
-    toon_intents = parse_toon_intents(INTENTS_TOON)
-    toon_report, toon_scores = classify_toon(message, toon_intents)
+    toon_report, toon_candidates = classify_toon(message, _PREPARED_TOON)
     
-    # Get top TOON candidate (scores are already sorted descending)
+    # Get top TOON candidate (candidates are already sorted descending)
     top_toon = None
-    if toon_scores and toon_scores[0] > 0:
-        # Re-classify to get full details for top candidate
-        candidates = []
-        for intent in toon_intents:
-            scores = combined_score(message, intent)
-            candidates.append({
-                "id": intent["id"],
-                "label": intent["label"],
-                "score": scores["final"]
-            })
-        candidates.sort(key=lambda x: x["score"], reverse=True)
-        top_toon = candidates[0] if candidates else None
-    
-    # Calculate lengths
-    json_str = json.dumps(INTENTS_JSON, indent=2)
-    json_length = len(json_str)
-    toon_length = len(INTENTS_TOON)
+    if toon_candidates and toon_candidates[0]["score"] > 0:
+        top_toon = toon_candidates[0]
+    
+    # Spec lengths (precomputed at import)
+    json_length = JSON_SPEC_LENGTH
+    toon_length = TOON_SPEC_LENGTH
     
     # Estimate tokens (rough approximation: 4 chars per token)
     json_tokens = json_length / 4.0
@@ -558,9 +731,7 @@ def compare_json_vs_toon(message: str) -> Dict[str, Any]:
 # --------------------------------------------------------------
 
 if __name__ == "__main__":
-    # Parse TOON intents
-    toon_intents = parse_toon_intents(INTENTS_TOON)
-    print(f"Parsed {len(toon_intents)} TOON intents\n")
+    print(f"Parsed {len(TOON_INTENTS)} TOON intents\n")
     
     # Test messages
     test_messages = [
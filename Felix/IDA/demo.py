@@ -7,7 +7,7 @@ def print_separator(title):
     print(f" {title}")
     print(f"{'='*60}\n")
 
-def run_interaction(scenario_name, messages, initial_mode="json"):
+def run_interaction(scenario_name, messages, initial_mode="json", realtime=False):
     print_separator(f"SCENARIO: {scenario_name}")
     
     # Initialize State
@@ -22,8 +22,9 @@ def run_interaction(scenario_name, messages, initial_mode="json"):
     for i, user_msg in enumerate(messages):
         print(f"👤 User: \"{user_msg}\"")
         
-        # Add a small delay for realism
-        time.sleep(0.5)
+        # Add a small delay for realism (only when a human is watching)
+        if realtime:
+            time.sleep(0.5)
         
         # Call the tool
         result = intent_disambiguation_function(user_msg, state)
@@ -53,7 +54,8 @@ if __name__ == "__main__":
         [
             "I want to handle my money",  # Vague -> triggers clarification
             "send money to mom"           # Clarification -> resolves to send_money
-        ]
+        ],
+        realtime=True
     )
 
     # --- SCENARIO 2: Direct Resolution (Standard Flow) ---
@@ -61,7 +63,8 @@ if __name__ == "__main__":
         "Direct Resolution (JSON Mode)",
         [
             "check my account balance"    # Clear -> resolves immediately
-        ]
+        ],
+        realtime=True
     )
 
     # --- SCENARIO 3: Developer Mode (TOON) ---
@@ -71,6 +74,7 @@ if __name__ == "__main__":
             "I need to pay services",     # Ambiguous in TOON logic
             "pay_bill"                    # Direct ID match clarification
         ],
-        initial_mode="toon"
+        initial_mode="toon",
+        realtime=True
     )
 
@@ -10,12 +10,77 @@ This module implements:
 import re
 import math
 import hashlib
-from typing import List, Dict, Any, Optional
-from ast import literal_eval
+import struct
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import List, Dict, Any, Optional, Sequence, Tuple, Union
 
-from .config import INTENTS_TOON
+from .config import INTENTS_JSON, INTENTS_TOON
 from .state import IntentCandidate
 
+# Split a TOON row on commas that are outside quotes and brackets
+_TOON_SPLIT_RE = re.compile(r',(?=(?:[^"]*"[^"]*")*[^"]*$)(?=(?:[^\[]*\[[^\]]*\])*[^\[]*$)')
+# Double-escaped regex sequences in TOON triggers (\\b -> \b, \\s -> \s)
+_TOON_ESCAPE_RE = re.compile(r'\\\\([bs])')
+
+# Stand-in for invalid trigger regexes: still counted, never matches
+_NEVER_MATCH = re.compile(r"(?!)")
+
+
+@lru_cache(maxsize=None)
+def _compile_trigger(pattern: str) -> re.Pattern:
+    """
+    Compile a single trigger (case-insensitive), once per distinct pattern.
+    """
+    try:
+        return re.compile(pattern, re.IGNORECASE)
+    except re.error:
+        return _NEVER_MATCH
+
+
+def compile_triggers(triggers: Sequence[str]) -> Tuple[re.Pattern, ...]:
+    """
+    Pre-compile a list of regex triggers for trigger_score.
+    """
+    return tuple(_compile_trigger(pattern) for pattern in triggers)
+
+
+def compile_trigger_union(triggers: Sequence[re.Pattern]) -> Optional[re.Pattern]:
+    """
+    Combine compiled triggers into a single alternation, used as a prefilter.
+    
+    If the union doesn't match, no individual trigger can match either, so
+    the per-trigger searches can be skipped. Returns None when no safe union
+    exists (no triggers, or triggers with groups that would renumber).
+    """
+    valid = [p for p in triggers if p is not _NEVER_MATCH]
+    if not valid or any(p.groups for p in valid):
+        return None
+    try:
+        return re.compile("|".join(f"(?:{p.pattern})" for p in valid), re.IGNORECASE)
+    except re.error:
+        return None
+
+
+def prepare_intent(intent: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Attach precomputed lookup data to an intent definition (in place).
+    
+    Adds:
+    - "_triggers_re": the compiled "triggers"
+    - "_trigger_union": all triggers as one alternation (or None)
+    - "_keywords_lc": the lowercased "keywords"
+    - "_id_lc" / "_label_lc": the lowercased "id" and "label"
+    - "_semantic_mag": the magnitude of "semantic_vector"
+    """
+    intent["_triggers_re"] = compile_triggers(intent["triggers"])
+    intent["_trigger_union"] = compile_trigger_union(intent["_triggers_re"])
+    intent["_keywords_lc"] = tuple(k.lower() for k in intent["keywords"])
+    intent["_id_lc"] = intent["id"].lower()
+    intent["_label_lc"] = intent["label"].lower()
+    intent["_semantic_mag"] = math.sqrt(sum(v * v for v in intent["semantic_vector"]))
+    return intent
+
 
 def parse_toon_intents(toon_str: str) -> List[Dict[str, Any]]:
     """
@@ -23,6 +88,29 @@ def parse_toon_intents(toon_str: str) -> List[Dict[str, Any]]:
     
     Expected format per line:
     id,label,keywords,description,starter_phrases,semantic_vector,triggers
+    
+    Parsing is cached per TOON string, but every call returns fresh
+    dictionaries and lists that the caller is free to modify.
+    """
+    return [
+        {
+            "id": intent_id,
+            "label": label,
+            "keywords": list(keywords),
+            "description": description,
+            "starter_phrases": list(starter_phrases),
+            "semantic_vector": list(semantic_vector),
+            "triggers": list(triggers)
+        }
+        for intent_id, label, keywords, description, starter_phrases, semantic_vector, triggers
+        in _parse_toon_rows(toon_str)
+    ]
+
+
+@lru_cache(maxsize=4)
+def _parse_toon_rows(toon_str: str) -> Tuple[Tuple[Any, ...], ...]:
+    """
+    Parse a TOON spec into immutable rows, in parse_toon_intents field order.
     """
     lines = toon_str.strip().split('\n')
     parsed_intents = []
@@ -44,7 +132,7 @@ def parse_toon_intents(toon_str: str) -> List[Dict[str, Any]]:
         
         # Regex to split by comma but ignore commas inside quotes or brackets
         # This is slightly more robust than split(',') but still lightweight
-        parts = re.split(r',(?=(?:[^"]*"[^"]*")*[^"]*$)(?=(?:[^\[]*\[[^\]]*\])*[^\[]*$)', line)
+        parts = _TOON_SPLIT_RE.split(line)
         
         if len(parts) < 7:
             continue
@@ -62,11 +150,14 @@ def parse_toon_intents(toon_str: str) -> List[Dict[str, Any]]:
         starters_raw = parts[4].strip().strip('"')
         starter_phrases = [s.strip() for s in starters_raw.split(',') if s.strip()]
         
-        # Semantic vector: safe eval of string list "[0.1, 0.2, ...]"
+        # Semantic vector: string list "[0.1, 0.2, ...]" parsed as floats
+        # (anything not fully bracketed falls back to the zero vector)
         vector_raw = parts[5].strip()
         try:
-            semantic_vector = literal_eval(vector_raw)
-        except (ValueError, SyntaxError):
+            if not (vector_raw.startswith('[') and vector_raw.endswith(']')):
+                raise ValueError(vector_raw)
+            semantic_vector = [float(x) for x in vector_raw[1:-1].split(',') if x.strip()]
+        except ValueError:
             semantic_vector = [0.0, 0.0, 0.0]
             
         # Triggers
@@ -74,40 +165,165 @@ def parse_toon_intents(toon_str: str) -> List[Dict[str, Any]]:
         # Handle escaped regex sequences if needed, but mostly raw string
         triggers = [t.strip() for t in triggers_raw.split(',') if t.strip()]
         # Fix escaped backslashes from TOON format (e.g. \\b -> \b)
-        triggers = [t.replace('\\b', r'\b').replace('\\s', r'\s') for t in triggers]
+        triggers = [_TOON_ESCAPE_RE.sub(r'\\\1', t) for t in triggers]
         
-        parsed_intents.append({
-            "id": intent_id,
-            "label": label,
-            "keywords": keywords,
-            "description": description,
-            "starter_phrases": starter_phrases,
-            "semantic_vector": semantic_vector,
-            "triggers": triggers
-        })
+        parsed_intents.append((
+            intent_id,
+            label,
+            tuple(keywords),
+            description,
+            tuple(starter_phrases),
+            tuple(semantic_vector),
+            tuple(triggers)
+        ))
+        
+    return tuple(parsed_intents)
+
+
+@dataclass(frozen=True, eq=False)
+class PreparedIntents:
+    """
+    Column-wise (structure-of-arrays) view of a list of intents.
+    
+    Row i of every field describes intents[i]. Built once per intents
+    list by prepare_intents() so classification only walks flat tuples.
+    """
+    intents: Tuple[Dict[str, Any], ...]
+    intent_map: Dict[str, Dict[str, Any]]
+    ids: Tuple[str, ...]
+    labels: Tuple[str, ...]
+    descriptions: Tuple[str, ...]
+    keywords_lc: Tuple[Tuple[str, ...], ...]
+    keyword_index: Tuple[Tuple[str, Tuple[int, ...]], ...]
+    triggers_re: Tuple[Tuple[re.Pattern, ...], ...]
+    trigger_unions: Tuple[Optional[re.Pattern], ...]
+    any_trigger: Optional[re.Pattern]
+    semantic_vectors: Tuple[Tuple[float, ...], ...]
+    semantic_mags: Tuple[float, ...]
+
+
+def build_keyword_index(
+    keywords_lc: Sequence[Sequence[str]],
+) -> Tuple[Tuple[str, Tuple[int, ...]], ...]:
+    """
+    Invert per-intent keyword lists into (keyword, owning intent indices).
+    
+    Each distinct keyword appears once, so a message is searched for it
+    once no matter how many intents list it. An index is repeated when an
+    intent lists the same keyword twice, which keeps the per-intent hit
+    count identical to _keyword_fraction.
+    """
+    index: Dict[str, List[int]] = {}
+    for idx, keywords in enumerate(keywords_lc):
+        for keyword in keywords:
+            index.setdefault(keyword, []).append(idx)
+    return tuple((keyword, tuple(owners)) for keyword, owners in index.items())
+
+
+# Content signature (see _intents_signature) -> PreparedIntents
+_PREPARED_CACHE: Dict[Tuple[Any, ...], PreparedIntents] = {}
+_PREPARED_CACHE_SIZE = 8
+
+
+def _intents_signature(intents: Sequence[Dict[str, Any]]) -> Tuple[Any, ...]:
+    """
+    Cache key capturing everything prepare_intents derives from `intents`.
+    
+    Changes whenever the list or any scored field changes (including in-place
+    edits of keyword/trigger/vector lists), so a cached PreparedIntents is
+    never reused for stale contents.
+    """
+    return tuple(
+        (
+            id(i),
+            i["id"],
+            i["label"],
+            i["description"],
+            tuple(i["keywords"]),
+            tuple(i["triggers"]),
+            tuple(i["semantic_vector"]),
+        )
+        for i in intents
+    )
+
+
+def prepare_intents(intents: Sequence[Dict[str, Any]]) -> PreparedIntents:
+    """
+    Return the PreparedIntents for an intents list, building it on first use.
+    
+    Results are cached on the list's current contents, so editing a list (or
+    its intents) after passing it in is picked up on the next call. An
+    already PreparedIntents is returned unchanged.
+    """
+    if isinstance(intents, PreparedIntents):
+        return intents
+        
+    signature = _intents_signature(intents)
+    cached = _PREPARED_CACHE.get(signature)
+    if cached is not None:
+        return cached
         
-    return parsed_intents
+    # Always prepare copies: derived keys on the caller's dicts may be stale
+    rows = [prepare_intent(dict(i)) for i in intents]
+    keywords_lc = tuple(i["_keywords_lc"] for i in rows)
+    triggers_re = tuple(i["_triggers_re"] for i in rows)
+    prepared = PreparedIntents(
+        intents=tuple(intents),
+        # id -> prepared intent definition (last one wins on duplicate ids)
+        intent_map={i["id"]: i for i in rows},
+        ids=tuple(i["id"] for i in rows),
+        labels=tuple(i["label"] for i in rows),
+        descriptions=tuple(i["description"] for i in rows),
+        keywords_lc=keywords_lc,
+        keyword_index=build_keyword_index(keywords_lc),
+        triggers_re=triggers_re,
+        trigger_unions=tuple(i["_trigger_union"] for i in rows),
+        # Every intent's triggers in one alternation (global prefilter)
+        any_trigger=compile_trigger_union([p for row in triggers_re for p in row]),
+        # Packed as float tuples: compact, immutable, no list over-allocation
+        semantic_vectors=tuple(tuple(map(float, i["semantic_vector"])) for i in rows),
+        semantic_mags=tuple(i["_semantic_mag"] for i in rows),
+    )
+    
+    if len(_PREPARED_CACHE) >= _PREPARED_CACHE_SIZE:
+        _PREPARED_CACHE.clear()
+    _PREPARED_CACHE[signature] = prepared
+    return prepared
+
+
+# Canonical prepared stores for the bundled specs, built once at import
+PREPARED_JSON = prepare_intents(INTENTS_JSON)
+PREPARED_TOON = prepare_intents(parse_toon_intents(INTENTS_TOON))
 
 
-def fake_embedding(text: str) -> List[float]:
+# First 12 digest bytes as three big-endian 32-bit integers
+_EMBEDDING_STRUCT = struct.Struct(">III")
+
+
+@lru_cache(maxsize=2048)
+def fake_embedding(text: str) -> Tuple[float, float, float]:
     """
     Convert text into a deterministic 3D vector using SHA256.
+    
+    Memoized: repeated messages (e.g. clarification turns) are free.
+    Returned as a tuple so cached vectors can't be mutated.
     """
-    hash_obj = hashlib.sha256(text.encode('utf-8'))
-    hex_str = hash_obj.hexdigest()
+    digest = hashlib.sha256(text.encode('utf-8')).digest()
     
-    # Extract 3 floats from hex string
-    # 8 hex chars = 4 bytes = 32 bits
-    max_val = 16**8
-    x = int(hex_str[0:8], 16) / max_val
-    y = int(hex_str[8:16], 16) / max_val
-    z = int(hex_str[16:24], 16) / max_val
+    # Extract 3 floats from the raw digest in one unpack (no hex string
+    # round-trip, no per-component slices)
+    # 4 bytes = 32 bits each
+    max_val = 2**32
+    a, b, c = _EMBEDDING_STRUCT.unpack_from(digest)
+    x = a / max_val
+    y = b / max_val
+    z = c / max_val
     
     # Normalize to unit length
     magnitude = math.sqrt(x*x + y*y + z*z)
     if magnitude > 0:
-        return [x/magnitude, y/magnitude, z/magnitude]
-    return [0.0, 0.0, 1.0]
+        return (x/magnitude, y/magnitude, z/magnitude)
+    return (0.0, 0.0, 1.0)
 
 
 def keyword_score(message: str, keywords: List[str]) -> float:
@@ -118,31 +334,42 @@ def keyword_score(message: str, keywords: List[str]) -> float:
     if not keywords:
         return 0.0
         
-    message_lower = message.lower()
-    found = sum(1 for k in keywords if k.lower() in message_lower)
-    return found / len(keywords)
+    return _keyword_fraction(message.lower(), [k.lower() for k in keywords])
+
+
+def _keyword_fraction(message_lower: str, keywords_lc: Sequence[str]) -> float:
+    """
+    keyword_score for an already-lowercased message and keyword list.
+    """
+    if not keywords_lc:
+        return 0.0
+        
+    found = sum(1 for k in keywords_lc if k in message_lower)
+    return found / len(keywords_lc)
 
 
-def trigger_score(message: str, triggers: List[str]) -> float:
+def trigger_score(message: str, triggers: Sequence[Union[str, re.Pattern]]) -> float:
     """
     Calculate regex trigger match score.
     Score = (#triggers matched) / len(triggers)
+    
+    Triggers may be pattern strings or pre-compiled patterns (see
+    compile_triggers); strings are compiled once and cached.
     """
     if not triggers:
         return 0.0
         
     count = 0
     for pattern in triggers:
-        try:
-            if re.search(pattern, message, re.IGNORECASE):
-                count += 1
-        except re.error:
-            continue
+        if isinstance(pattern, str):
+            pattern = _compile_trigger(pattern)
+        if pattern.search(message):
+            count += 1
             
     return count / len(triggers)
 
 
-def semantic_score(user_vec: List[float], intent_vec: List[float]) -> float:
+def semantic_score(user_vec: Sequence[float], intent_vec: Sequence[float]) -> float:
     """
     Calculate cosine similarity between two vectors.
     """
@@ -159,6 +386,26 @@ def semantic_score(user_vec: List[float], intent_vec: List[float]) -> float:
     return dot_product / (mag_a * mag_b)
 
 
+def _semantic_scores(user_vec: Sequence[float], prepared: PreparedIntents) -> List[float]:
+    """
+    Cosine similarity of `user_vec` against every prepared intent vector.
+    
+    Same values as semantic_score, with the user-side magnitude computed
+    once for all intents instead of once per intent.
+    """
+    mag_a = math.sqrt(sum(a * a for a in user_vec))
+    dim = len(user_vec)
+    
+    scores = []
+    for intent_vec, intent_mag in zip(prepared.semantic_vectors, prepared.semantic_mags):
+        if len(intent_vec) != dim or mag_a == 0 or intent_mag == 0:
+            scores.append(0.0)
+            continue
+        dot_product = sum(a * b for a, b in zip(user_vec, intent_vec))
+        scores.append(dot_product / (mag_a * intent_mag))
+    return scores
+
+
 def combined_score(message: str, intent: Dict[str, Any]) -> Dict[str, Any]:
     """
     Compute weighted combined score for an intent.
@@ -187,33 +434,86 @@ def combined_score(message: str, intent: Dict[str, Any]) -> Dict[str, Any]:
     }
 
 
-def simple_classifier(message: str, intents: List[Dict[str, Any]] = None) -> List[IntentCandidate]:
+@lru_cache(maxsize=4096)
+def ranked_scores(message: str, prepared: PreparedIntents) -> Tuple[Tuple[int, float], ...]:
     """
-    Classify a message against provided intents and return sorted candidates.
-    If intents is None, defaults to parsing INTENTS_TOON.
+    Score `message` against every prepared intent.
+    
+    Returns (intent index, score) pairs sorted by score descending (stable:
+    ties keep intent order). Memoized on the exact message text and the
+    prepared intents, so repeated messages (clarification retries,
+    /compare_modes) cost a dict lookup.
     """
-    if intents is None:
-        intents = parse_toon_intents(INTENTS_TOON)
-        
-    candidates_data = []
+    message_lower = message.lower()
+    
+    # Keyword hits for all intents: each distinct keyword is searched once
+    hits = [0] * len(prepared.ids)
+    for keyword, owners in prepared.keyword_index:
+        if keyword in message_lower:
+            for idx in owners:
+                hits[idx] += 1
+    
+    # Semantic similarity for all intents in one pass
+    s_scores = _semantic_scores(fake_embedding(message), prepared)
     
-    for intent in intents:
-        result = combined_score(message, intent)
-        candidates_data.append(result)
+    # One regex pass over all intents' triggers: most messages hit none,
+    # which settles every trigger score at 0 without per-intent searches
+    any_trigger = prepared.any_trigger
+    no_triggers = any_trigger is not None and any_trigger.search(message) is None
+    
+    scores = []
+    for keywords_lc, found, triggers_re, union, s_score in zip(
+        prepared.keywords_lc, hits, prepared.triggers_re, prepared.trigger_unions, s_scores
+    ):
+        # Same value as _keyword_fraction(message_lower, keywords_lc)
+        k_score = found / len(keywords_lc) if keywords_lc else 0.0
+        if no_triggers or (union is not None and union.search(message) is None):
+            t_score = 0.0  # one regex pass proves no trigger matches
+        else:
+            t_score = trigger_score(message, triggers_re)
+        # Same weighting as combined_score
+        scores.append((0.5 * k_score) + (0.3 * t_score) + (0.2 * max(0.0, s_score)))
         
-    # Sort by score descending
-    candidates_data.sort(key=lambda x: x["score"], reverse=True)
+    order = sorted(range(len(scores)), key=scores.__getitem__, reverse=True)
+    return tuple((idx, scores[idx]) for idx in order)
+
+
+@lru_cache(maxsize=4096)
+def ranked_candidates(message: str, prepared: PreparedIntents) -> Tuple[IntentCandidate, ...]:
+    """
+    ranked_scores as IntentCandidate objects, built straight from the
+    prepared columns.
     
-    # Convert to IntentCandidate objects
-    candidates = []
-    for data in candidates_data:
-        candidate = IntentCandidate(
-            id=data["id"],
-            label=data["label"],
-            confidence=data["score"],
-            description=data["intent_data"]["description"]
+    IntentCandidate is frozen, so the cached objects are shared safely
+    between calls and callers.
+    """
+    return tuple(
+        IntentCandidate(
+            id=prepared.ids[idx],
+            label=prepared.labels[idx],
+            confidence=score,
+            description=prepared.descriptions[idx]
         )
-        candidates.append(candidate)
-        
-    return candidates
+        for idx, score in ranked_scores(message, prepared)
+    )
 
+
+def simple_classifier(
+    message: str,
+    intents: Union[List[Dict[str, Any]], PreparedIntents] = None,
+    top_k: Optional[int] = None,
+) -> List[IntentCandidate]:
+    """
+    Classify a message against provided intents and return sorted candidates.
+    If intents is None, defaults to the parsed INTENTS_TOON (PREPARED_TOON).
+    
+    If top_k is given, only the top_k best candidates are returned (same
+    order as the full list).
+    """
+    prepared = PREPARED_TOON if intents is None else prepare_intents(intents)
+    candidates = ranked_candidates(message, prepared)
+    if top_k is not None:
+        candidates = candidates[:top_k]
+    
+    # Fresh list per call; the (immutable) candidates themselves are cached
+    return list(candidates)
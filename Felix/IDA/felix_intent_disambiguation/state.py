@@ -4,15 +4,18 @@ State management for the Intent Disambiguation Agent.
 This module defines pure dataclasses for representing agent state and intent candidates.
 No ADK imports or side effects here - keep it clean and testable.
 """
-from dataclasses import dataclass, field
-from typing import List, Optional, Literal
+from dataclasses import MISSING, dataclass, field, fields
+from typing import List, Optional, Literal, Sequence
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class IntentCandidate:
     """
     Represents a single possible intent classification result.
     
+    Immutable and slotted: candidates are small value objects that the
+    classifier can build once and share between calls.
+    
     Attributes:
         id: Machine-friendly identifier, e.g. "send_money"
         label: Human-readable label, e.g. "Send money"
@@ -51,4 +54,27 @@ class IdaState:
     ambiguity_reason: Optional[str] = None
     mode: Literal["json", "toon"] = "json"
 
-
+    def reset(self, preserve: Sequence[str] = ()) -> None:
+        """
+        Reset every field to its declared default, in place.
+        
+        Fields named in `preserve` (e.g. ("mode",)) keep their values; an
+        unknown name raises ValueError. List fields are cleared in place
+        rather than replaced.
+        """
+        names = {f.name for f in fields(self)}
+        unknown = [name for name in preserve if name not in names]
+        if unknown:
+            raise ValueError(f"Unknown IdaState field(s) in preserve: {', '.join(unknown)}")
+            
+        for f in fields(self):
+            if f.name in preserve:
+                continue
+            if f.default_factory is not MISSING:
+                current = getattr(self, f.name)
+                if isinstance(current, list):
+                    current.clear()
+                else:
+                    setattr(self, f.name, f.default_factory())
+            else:
+                setattr(self, f.name, f.default)
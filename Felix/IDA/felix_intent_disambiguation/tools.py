@@ -4,20 +4,41 @@ Tools for the Intent Disambiguation Agent.
 This module defines the primary FunctionTool that contains the core business logic
 for intent disambiguation.
 """
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 
 from google.adk.tools import FunctionTool
 
 from .state import IdaState, IntentCandidate
-from .classifier import simple_classifier, parse_toon_intents
-from .config import INTENTS_TOON, INTENTS_JSON
+from .classifier import simple_classifier, PREPARED_JSON, PREPARED_TOON
 from .developer import handle_developer_command
 
 
+def _lowered_terms(
+    cand: IntentCandidate,
+    intent_def: Optional[Dict[str, Any]]
+) -> Tuple[str, str, Sequence[str]]:
+    """
+    Lowercased (id, label, keywords) for a candidate.
+    
+    Uses the values precomputed by prepare_intent when available; a
+    candidate without an intent definition has no keywords.
+    """
+    if intent_def is None:
+        return cand.id.lower(), cand.label.lower(), ()
+    if "_id_lc" in intent_def:
+        return intent_def["_id_lc"], intent_def["_label_lc"], intent_def["_keywords_lc"]
+    return (
+        cand.id.lower(),
+        cand.label.lower(),
+        [k.lower() for k in intent_def.get("keywords", [])],
+    )
+
+
 def resolve_clarification(
     clarification: str,
     candidates: List[IntentCandidate],
-    intents_data: List[Dict[str, Any]]
+    intents_data: List[Dict[str, Any]],
+    intent_map: Optional[Dict[str, Dict[str, Any]]] = None
 ) -> str:
     """
     Resolves the user's clarification message to a specific intent ID.
@@ -27,30 +48,32 @@ def resolve_clarification(
     2. Label match
     3. Keyword match against candidate intent definitions
     4. Fallback to top candidate
+    
+    `intent_map` (id -> definition of intents_data) can be passed in when
+    already built, e.g. PreparedIntents.intent_map.
     """
     clarification_lower = clarification.lower().strip()
     
+    # Map candidate IDs to their full definition; prepared intents carry
+    # lowercased id/label/keywords, so nothing is lowered per call
+    if intent_map is None:
+        intent_map = {i["id"]: i for i in intents_data}
+    lowered = [_lowered_terms(cand, intent_map.get(cand.id)) for cand in candidates]
+    
     # 1. Exact ID match
-    for cand in candidates:
-        if cand.id.lower() in clarification_lower:
+    for cand, (id_lc, _, _) in zip(candidates, lowered):
+        if id_lc in clarification_lower:
             return cand.id
             
     # 2. Label match
-    for cand in candidates:
-        if cand.label.lower() in clarification_lower:
+    for cand, (_, label_lc, _) in zip(candidates, lowered):
+        if label_lc in clarification_lower:
             return cand.id
             
     # 3. Keyword match (using full intent definition for keywords)
-    # Map candidate IDs to their full definition to access keywords
-    intent_map = {i["id"]: i for i in intents_data}
-    
-    for cand in candidates:
-        intent_def = intent_map.get(cand.id)
-        if not intent_def:
-            continue
-            
-        for keyword in intent_def.get("keywords", []):
-            if keyword.lower() in clarification_lower:
+    for cand, (_, _, keywords_lc) in zip(candidates, lowered):
+        for keyword in keywords_lc:
+            if keyword in clarification_lower:
                 return cand.id
                 
     # 4. Fallback: return top candidate
@@ -92,11 +115,12 @@ def intent_disambiguation_function(
         # handle commands WITHOUT modifying phase logic
         return handle_developer_command(user_message, state)
 
-    # Determine intents based on mode (needed for both phases)
+    # Determine intents based on mode (needed for both phases);
+    # both specs are parsed and prepared once at import
     if state.mode == "json":
-        intents = INTENTS_JSON
+        prepared = PREPARED_JSON
     else:
-        intents = parse_toon_intents(INTENTS_TOON)
+        prepared = PREPARED_TOON
 
     # 1. Save user_message into state
     # NOTE: In "awaiting_clarification", user_message is the clarification.
@@ -109,10 +133,8 @@ def intent_disambiguation_function(
     # --- PHASE: INITIAL ---
     if state.phase == "initial":
         # 2. Call simple_classifier to obtain sorted candidates
-        candidates = simple_classifier(user_message, intents)
-        
-        # 3. Extract top 3 candidates and store them
-        top_candidates = candidates[:3]
+        # 3. Only the top 3 are used, so only build those, and store them
+        top_candidates = simple_classifier(user_message, prepared, top_k=3)
         state.candidate_intents = top_candidates
         
         if not top_candidates:
@@ -176,7 +198,8 @@ def intent_disambiguation_function(
         selected_id = resolve_clarification(
             clarification=user_message,
             candidates=state.candidate_intents,
-            intents_data=intents
+            intents_data=prepared.intents,
+            intent_map=prepared.intent_map
         )
         
         # Update state to RESOLVED
@@ -11,34 +11,53 @@ This script simulates a live conversation loop, allowing you to:
 Usage:
     python interactive_demo.py
 """
+import io
 import sys
 import json
 import pprint
 import time
-from typing import Any, Dict, List
+from collections import OrderedDict
+from contextlib import redirect_stdout
+from typing import Any, Dict
+
+try:
+    import orjson  # Optional: C-level JSON formatting for per-turn output
+except ImportError:
+    orjson = None
 
 # Import agent and state components
 from felix_intent_disambiguation import ida_agent, IdaState
 from felix_intent_disambiguation.tools import intent_disambiguation_tool
-from felix_intent_disambiguation.developer import handle_developer_command
 
-# Import analysis tools for experiment mode
-try:
-    from analysis.classifier_compare import compare_json_vs_toon
-except ImportError:
-    # Fallback if running from wrong directory
-    sys.path.append('.')
-    from analysis.classifier_compare import compare_json_vs_toon
+def load_compare_json_vs_toon():
+    """Imports the analysis comparator on first use (only experiment mode needs it)."""
+    try:
+        from analysis.classifier_compare import compare_json_vs_toon
+    except ImportError:
+        # Fallback if running from wrong directory
+        sys.path.append('.')
+        from analysis.classifier_compare import compare_json_vs_toon
+    return compare_json_vs_toon
 
 def print_header(title: str):
     print(f"\n{'='*60}")
     print(f" {title}")
     print(f"{'='*60}\n")
 
+def format_structured(content: Any) -> str:
+    """Indented JSON text for dicts/lists (orjson if installed, else json)."""
+    if orjson is not None:
+        return orjson.dumps(content, option=orjson.OPT_INDENT_2).decode()
+    return json.dumps(content, indent=2, ensure_ascii=False)
+
 def print_section(title: str, content: Any):
     print(f"\n--- {title} ---")
     if isinstance(content, (dict, list)):
-        pprint.pprint(content, indent=2, width=80)
+        try:
+            print(format_structured(content))
+        except TypeError:
+            # Not JSON-serializable (orjson's error is a TypeError too)
+            pprint.pprint(content, indent=2, width=80)
     else:
         print(content)
 
@@ -63,6 +82,7 @@ def show_experiment_report(original_message: str):
     print(f"Analyzing message: \"{original_message}\"")
     
     try:
+        compare_json_vs_toon = load_compare_json_vs_toon()
         result = compare_json_vs_toon(original_message)
         
         print("\n1. EFFICIENCY METRICS:")
@@ -101,27 +121,29 @@ def show_experiment_report(original_message: str):
     
     print("\n" + "="*60)
 
-def show_session_comparison(history: List[Dict[str, Any]]):
-    """Compares full flows stored in session history."""
+# Max distinct messages kept in the session history (oldest evicted first)
+SESSION_HISTORY_LIMIT = 256
+
+def record_flow(history: "OrderedDict[str, Dict[str, Dict[str, Any]]]", entry: Dict[str, Any]):
+    """Stores a completed flow, grouped by message and mode (latest run wins)."""
+    msg = entry['message']
+    if msg not in history and len(history) >= SESSION_HISTORY_LIMIT:
+        history.popitem(last=False)
+    history.setdefault(msg, {})[entry['mode']] = entry
+
+def show_session_comparison(history: "OrderedDict[str, Dict[str, Dict[str, Any]]]"):
+    """Compares full flows stored in session history (grouped by message)."""
     print_header("SESSION FLOW COMPARISON REPORT")
     
     if not history:
         print("No completed flows in history yet.")
         return
 
-    # Group by original message
-    grouped = {}
-    for entry in history:
-        msg = entry['message']
-        if msg not in grouped:
-            grouped[msg] = {'json': None, 'toon': None}
-        grouped[msg][entry['mode']] = entry
-
     # Display comparison
     found_comparison = False
-    for msg, modes in grouped.items():
-        json_run = modes['json']
-        toon_run = modes['toon']
+    for msg, modes in history.items():
+        json_run = modes.get('json')
+        toon_run = modes.get('toon')
         
         if json_run or toon_run:
             print(f"\nMessage: \"{msg}\"")
@@ -191,8 +213,8 @@ def run_interactive_loop():
     current_flow_steps = 0
     current_top_score = 0.0
     
-    # Session History: List of {message, mode, resolved_intent, top_score, steps}
-    session_history = []
+    # Session History: message -> mode -> {message, mode, resolved_intent, top_score, steps}
+    session_history: "OrderedDict[str, Dict[str, Dict[str, Any]]]" = OrderedDict()
     
     while True:
         try:
@@ -218,84 +240,102 @@ def run_interactive_loop():
 
             current_flow_steps += 1
 
-            # --- Step 1: Agent Processing (Simulated) ---
-            print_section("AGENT ACTION", "Analyzing input...")
+            # Render the turn into one buffer and write it out in a single
+            # call (also on errors) instead of one print per line
+            turn_output = io.StringIO()
+            real_stdout = sys.stdout
+            try:
+                with redirect_stdout(turn_output):
+                    # --- Step 1: Agent Processing (Simulated) ---
+                    print_section("AGENT ACTION", "Analyzing input...")
 
-            # --- Step 2: Tool Execution ---
-            print(f"🛠  TOOL CALL: intent_disambiguation_tool(message='{user_input}')")
-            
-            # Execute the tool function directly to show internal logic
-            tool_result = intent_disambiguation_tool.func(user_input, state)
-            
-            print_section("TOOL RESULT", tool_result)
-            
-            # Capture score from first turn for history
-            if state.phase in ["awaiting_clarification", "resolved"] and current_flow_steps == 1:
-                 if state.candidate_intents:
-                     current_top_score = state.candidate_intents[0].confidence
-            
-            # --- Step 3: Ambiguity & Logic Explanation ---
-            status = tool_result.get("status")
-            
-            if status == "NEED_CLARIFICATION":
-                reason = state.ambiguity_reason
-                print(f"\n⚠️  AMBIGUITY DETECTED: {reason}")
-                if reason == "low_confidence":
-                    print("   -> Top candidate score was below threshold (< 0.30).")
-                elif reason == "close_scores":
-                    print("   -> Top candidates had very similar scores (diff < 0.15).")
-                elif reason == "no_candidates":
-                    print("   -> No valid intents found.")
-                
-                print("   Top Candidates:")
-                for c in state.candidate_intents[:3]:
-                    print(f"   - {c.id}: {c.confidence:.3f}")
-
-            elif status == "RESOLVED":
-                print(f"\n✅  RESOLVED")
-                print(f"   -> Final Intent: {state.selected_intent_id}")
-                if state.phase == "resolved" and not state.ambiguity_reason:
-                     print("   -> High confidence. No clarification needed.")
-                else:
-                     print("   -> Resolved after clarification.")
-
-            elif status == "ACK":
-                print(f"\nℹ️  SYSTEM COMMAND ACKNOWLEDGED")
-
-            elif status == "DEVELOPER_COMPARE":
-                print(f"\n🔍  DEVELOPER COMPARISON RUN")
-                # Fallback if user types /compare_modes inside agent logic (though we trap it above now)
-                pass
-
-            # --- Step 4: Updated State ---
-            print_section("UPDATED STATE", format_state(state))
-            
-            # --- Step 5: Final Agent Response ---
-            agent_response = tool_result.get("message_to_user", "No response text.")
-            print(f"\n🤖 AGENT RESPONSE: \"{agent_response}\"")
-            
-            # --- Step 6: Experiment Report (if enabled and resolved) ---
-            if experiment_mode and status == "RESOLVED" and current_flow_message:
-                # Save to history
-                session_history.append({
-                    "message": current_flow_message,
-                    "mode": state.mode,
-                    "resolved_intent": state.selected_intent_id,
-                    "top_score": current_top_score,
-                    "steps": current_flow_steps
-                })
-                
-                time.sleep(0.5)
-                show_experiment_report(current_flow_message)
-                current_flow_message = None # Reset for next flow
-
-            # Reset state if resolved (to allow new interactions in same loop)
-            if state.phase == "resolved":
-                print("\n[ℹ️  Conversation flow complete. State reset for next turn.]")
-                # Preserve mode, reset flow
-                current_mode = state.mode
-                state = IdaState() 
-                state.mode = current_mode
+                    # --- Step 2: Tool Execution ---
+                    print(f"🛠  TOOL CALL: intent_disambiguation_tool(message='{user_input}')")
+
+                    # Execute the tool function directly to show internal logic
+                    tool_result = intent_disambiguation_tool.func(user_input, state)
+
+                    # Debug sections only when they're useful: always in experiment
+                    # mode, otherwise while a clarification is pending
+                    show_debug = experiment_mode or state.phase == "awaiting_clarification"
+
+                    if show_debug:
+                        print_section("TOOL RESULT", tool_result)
+
+                    # Capture score from first turn for history
+                    if state.phase in ["awaiting_clarification", "resolved"] and current_flow_steps == 1:
+                        if state.candidate_intents:
+                            current_top_score = state.candidate_intents[0].confidence
+
+                    # --- Step 3: Ambiguity & Logic Explanation ---
+                    status = tool_result.get("status")
+
+                    if status == "NEED_CLARIFICATION":
+                        reason = state.ambiguity_reason
+                        print(f"\n⚠️  AMBIGUITY DETECTED: {reason}")
+                        if reason == "low_confidence":
+                            print("   -> Top candidate score was below threshold (< 0.30).")
+                        elif reason == "close_scores":
+                            print("   -> Top candidates had very similar scores (diff < 0.15).")
+                        elif reason == "no_candidates":
+                            print("   -> No valid intents found.")
+
+                        print("   Top Candidates:")
+                        for c in state.candidate_intents[:3]:
+                            print(f"   - {c.id}: {c.confidence:.3f}")
+
+                    elif status == "RESOLVED":
+                        print(f"\n✅  RESOLVED")
+                        print(f"   -> Final Intent: {state.selected_intent_id}")
+                        if state.phase == "resolved" and not state.ambiguity_reason:
+                            print("   -> High confidence. No clarification needed.")
+                        else:
+                            print("   -> Resolved after clarification.")
+
+                    elif status == "ACK":
+                        print(f"\nℹ️  SYSTEM COMMAND ACKNOWLEDGED")
+
+                    elif status == "DEVELOPER_COMPARE":
+                        print(f"\n🔍  DEVELOPER COMPARISON RUN")
+                        # Fallback if user types /compare_modes inside agent logic (though we trap it above now)
+                        pass
+
+                    # --- Step 4: Updated State ---
+                    if show_debug:
+                        print_section("UPDATED STATE", format_state(state))
+
+                    # --- Step 5: Final Agent Response ---
+                    agent_response = tool_result.get("message_to_user", "No response text.")
+                    print(f"\n🤖 AGENT RESPONSE: \"{agent_response}\"")
+
+                    # --- Step 6: Experiment Report (if enabled and resolved) ---
+                    if experiment_mode and status == "RESOLVED" and current_flow_message:
+                        # Save to history
+                        record_flow(session_history, {
+                            "message": current_flow_message,
+                            "mode": state.mode,
+                            "resolved_intent": state.selected_intent_id,
+                            "top_score": current_top_score,
+                            "steps": current_flow_steps
+                        })
+
+                        # Show the turn so far before pausing, not after
+                        real_stdout.write(turn_output.getvalue())
+                        real_stdout.flush()
+                        turn_output.seek(0)
+                        turn_output.truncate()
+                        time.sleep(0.5)
+                        show_experiment_report(current_flow_message)
+                        current_flow_message = None # Reset for next flow
+
+                    # Reset state if resolved (to allow new interactions in same loop)
+                    if state.phase == "resolved":
+                        print("\n[ℹ️  Conversation flow complete. State reset for next turn.]")
+                        # Preserve mode, reset flow
+                        state.reset(preserve=("mode",))
+            finally:
+                sys.stdout.write(turn_output.getvalue())
+                sys.stdout.flush()
 
         except KeyboardInterrupt:
             print("\n\nExiting demo. Goodbye!")
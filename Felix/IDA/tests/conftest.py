@@ -0,0 +1,12 @@
+"""
+Shared pytest fixtures.
+"""
+import pytest
+
+from felix_intent_disambiguation.state import IdaState
+
+
+@pytest.fixture
+def fresh_state():
+    """A new IdaState in its default ("initial", JSON mode) configuration."""
+    return IdaState()
@@ -4,15 +4,20 @@ Tests for the classifier module.
 Tests keyword scoring, trigger scoring, semantic scoring,
 and the simple_classifier function.
 """
+import json
+
 import pytest
 from felix_intent_disambiguation.classifier import (
     keyword_score,
     trigger_score,
+    compile_triggers,
+    compile_trigger_union,
     semantic_score,
     fake_embedding,
+    parse_toon_intents,
     simple_classifier
 )
-from felix_intent_disambiguation.config import INTENTS_JSON
+from felix_intent_disambiguation.config import INTENTS_JSON, INTENTS_TOON, SUPPORTED_INTENTS
 
 
 def test_keyword_score_basic():
@@ -77,6 +82,23 @@ def test_trigger_score_case_insensitive():
     assert score == 1.0
 
 
+def test_trigger_union_prefilter():
+    """Test that the combined trigger alternation agrees with trigger_score."""
+    triggers = compile_triggers([r"\btransfer\b", r"\bsend money\b", r"[invalid"])
+    union = compile_trigger_union(triggers)
+    
+    assert union is not None
+    assert union.search("SEND MONEY now")
+    assert trigger_score("SEND MONEY now", triggers) > 0.0
+    
+    # No union match means no individual trigger matches
+    assert union.search("hello world") is None
+    assert trigger_score("hello world", triggers) == 0.0
+    
+    # Nothing to combine
+    assert compile_trigger_union(compile_triggers([])) is None
+
+
 def test_semantic_score_determinism():
     """Test that semantic scoring is deterministic."""
     user_vec = [0.5, 0.5, 0.707]
@@ -189,3 +211,42 @@ def test_simple_classifier_pay_bill():
     top_ids = [c.id for c in candidates[:3]]
     assert "pay_bill" in top_ids
 
+
+def test_config_intents_stay_plain_data():
+    """Test that classifying doesn't write prepared data into config intents."""
+    simple_classifier("I want to send money", INTENTS_JSON)
+    
+    for intent in INTENTS_JSON:
+        assert not any(key.startswith("_") for key in intent)
+    json.dumps(SUPPORTED_INTENTS)
+
+
+def test_parse_toon_intents_returns_fresh_plain_data():
+    """Test that edits to one parse result don't leak into the next call."""
+    first = parse_toon_intents(INTENTS_TOON)
+    first[0]["keywords"].clear()
+    first[0]["id"] = "edited"
+    
+    second = parse_toon_intents(INTENTS_TOON)
+    assert second[0]["id"] == "send_money"
+    assert second[0]["keywords"]
+    json.dumps(second)
+
+
+def test_simple_classifier_sees_intent_list_changes():
+    """Test that edits to a custom intents list between calls are picked up."""
+    intents = [dict(i, keywords=list(i["keywords"])) for i in INTENTS_JSON[:2]]
+    
+    candidates = simple_classifier("send money", intents)
+    assert len(candidates) == 2
+    
+    # Appending an intent adds a candidate
+    intents.append(dict(INTENTS_JSON[2]))
+    candidates = simple_classifier("send money", intents)
+    assert len(candidates) == 3
+    
+    # Editing keywords in place changes the score
+    before = {c.id: c.confidence for c in candidates}
+    intents[0]["keywords"].clear()
+    after = {c.id: c.confidence for c in simple_classifier("send money", intents)}
+    assert after[intents[0]["id"]] != before[intents[0]["id"]]
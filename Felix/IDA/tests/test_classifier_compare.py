@@ -0,0 +1,108 @@
+"""
+Tests for the JSON vs TOON comparison classifier in analysis/.
+
+Covers the TOON parser's edge cases and the scorer outputs.
+"""
+import json
+import random
+from difflib import SequenceMatcher
+
+import pytest
+from analysis.classifier_compare import (
+    INTENTS_JSON,
+    INTENTS_TOON,
+    TOON_INTENTS,
+    _max_starter_similarity,
+    classify_json,
+    classify_toon,
+    parse_toon_intents,
+)
+
+
+def _parse_row(row):
+    """Parse a single TOON data row (with header) and return its intent."""
+    intents = parse_toon_intents("intents[1]{...}:\n  " + row)
+    assert len(intents) == 1
+    return intents[0]
+
+
+def test_parse_toon_bracketed_trigger_stays_whole():
+    """Test that a trigger with a character class isn't split on its brackets."""
+    intent = _parse_row(
+        'pay_bill,Pay Bill,"pay,bill","Pay.","Pay my bill",[0.1,0.8,0.1],"\\bpay\\b,[0-9]+ dollars"'
+    )
+    
+    assert intent["triggers"] == ["\\bpay\\b", "[0-9]+ dollars"]
+    assert intent["semantic_vector"] == [0.1, 0.8, 0.1]
+
+
+def test_parse_toon_escaped_comma_in_trigger():
+    """Test that an escaped comma doesn't split a trigger."""
+    intent = _parse_row(
+        'pay_bill,Pay Bill,"pay,bill","Pay.","Pay my bill",[0.1,0.8,0.1],"a\\,b,c"'
+    )
+    
+    assert intent["triggers"] == ["a\\,b", "c"]
+
+
+def test_parse_toon_keeps_empty_segments():
+    """Test that empty list segments are kept, but a trailing trigger comma adds nothing."""
+    intent = _parse_row(
+        'pay_bill,Pay Bill,"pay,,bill","Pay.","Pay,,now",[0.1,0.8,0.1],"a,,b"'
+    )
+    assert intent["keywords"] == ["pay", "", "bill"]
+    assert intent["starter_phrases"] == ["Pay", "", "now"]
+    assert intent["triggers"] == ["a", "", "b"]
+    
+    intent = _parse_row('pay_bill,Pay Bill,,"Pay.","Pay",[0.1,0.8,0.1],"a,b,"')
+    assert intent["keywords"] == [""]
+    assert intent["triggers"] == ["a", "b"]
+
+
+def test_spec_constants_stay_plain_data():
+    """Test that the JSON spec and parsed TOON intents stay JSON-serializable."""
+    json.dumps(INTENTS_JSON)
+    json.dumps(TOON_INTENTS)
+    json.dumps(parse_toon_intents(INTENTS_TOON))
+
+
+def test_classify_toon_report_matches_candidates():
+    """Test that classify_toon returns its report and the sorted candidates."""
+    report, candidates = classify_toon("send money now", TOON_INTENTS)
+    
+    assert [c["id"] for c in candidates] == ["send_money", "pay_bill", "check_balance"]
+    assert candidates[0]["score"] == pytest.approx(0.6749461463694235)
+    assert candidates[1]["score"] == pytest.approx(0.07873203501856196)
+    assert candidates[2]["score"] == pytest.approx(0.06020494343292121)
+    
+    rows = report.split("\n")[2:]
+    assert rows[0] == "    send_money,0.675,0.667,0.500,0.997,0.588"
+    assert [row.split(",")[0].strip() for row in rows] == [c["id"] for c in candidates]
+
+
+def test_classify_json_sorted_by_score():
+    """Test that classify_json returns every intent sorted by final score."""
+    candidates = classify_json("I need to pay my bill")
+    
+    assert candidates[0]["id"] == "pay_bill"
+    assert {c["id"] for c in candidates} == {i["id"] for i in INTENTS_JSON}
+    scores = [c["score"] for c in candidates]
+    assert scores == sorted(scores, reverse=True)
+
+
+def test_max_starter_similarity_matches_full_ratio():
+    """Test that the pruned starter search returns the exact maximum ratio."""
+    rng = random.Random(0)
+    words = ["send", "money", "pay", "my", "bill", "check", "balance", "i", "need", "to"]
+    
+    for _ in range(200):
+        message = " ".join(rng.choice(words) for _ in range(rng.randint(0, 6)))
+        starters = [
+            " ".join(rng.choice(words) for _ in range(rng.randint(1, 6)))
+            for _ in range(rng.randint(0, 5))
+        ]
+        expected = max(
+            (SequenceMatcher(None, message, s).ratio() for s in starters),
+            default=0.0,
+        )
+        assert _max_starter_similarity(message, starters) == expected
@@ -3,6 +3,8 @@ Tests for the Intent Disambiguation Agent logic.
 
 This module contains tests for state management and disambiguation logic.
 """
+import pytest
+
 from felix_intent_disambiguation.state import IdaState, IntentCandidate
 
 
@@ -11,3 +13,23 @@ def test_ida_state_default_phase_is_initial():
     state = IdaState()
     assert state.phase == "initial"
 
+
+def test_ida_state_reset_preserves_requested_fields():
+    """Test that IdaState.reset returns to 'initial' but keeps preserved fields."""
+    state = IdaState(mode="toon")
+    state.phase = "resolved"
+    state.last_user_message = "send money"
+    state.candidate_intents.append(
+        IntentCandidate(id="send_money", label="Send Money", confidence=0.9, description="")
+    )
+    state.selected_intent_id = "send_money"
+    
+    state.reset(preserve=("mode",))
+    
+    assert state == IdaState(mode="toon")
+    
+    state.reset()
+    assert state.mode == "json"
+    
+    with pytest.raises(ValueError):
+        state.reset(preserve=("modes",))